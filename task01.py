@@ -1,12 +1,20 @@
 import random
 import time
+from bisect import bisect_left, bisect_right, insort
 from collections import OrderedDict
+from itertools import accumulate
+
+# Типи запитів кодуються цілими числами замість рядків
+RANGE = 0
+UPDATE = 1
 
 class LRUCache:
     '''Реализація LRU-кешу'''
     def __init__(self, capacity: int):
         self.cache = OrderedDict()
         self.capacity = capacity
+        # Ключі-діапазони (left, right), відсортовані за лівою межею
+        self.sorted_keys = []
 
     def get(self, key: tuple) -> int:
         '''Отримуємо значення з кешу за ключем'''
@@ -18,19 +26,71 @@ class LRUCache:
         
     def put(self, key: tuple, value: int) -> None:
         '''Додатємо або оновлюємо пару ключ-значення в кеші'''
+        if key not in self.cache:
+            insort(self.sorted_keys, key)
         self.cache[key] = value
         self.cache.move_to_end(key)
         if len(self.cache) > self.capacity:
-            self.cache.popitem(last=False)
+            evicted, _ = self.cache.popitem(last=False)
+            self._remove_sorted(evicted)
 
-    def get_keys(self) -> list:
-        '''Повертає список ключів у кеші'''
-        return list(self.cache.keys())
+    def invalidate(self, index: int) -> None:
+        '''Видаляє з кешу всі діапазони, що містять індекс, за один прохід'''
+        # Кандидати — лише діапазони з left <= index
+        end = bisect_right(self.sorted_keys, (index, float('inf')))
+        kept = []
+        for key in self.sorted_keys[:end]:
+            if key[1] >= index:
+                del self.cache[key]
+            else:
+                kept.append(key)
+        # Один зсув списку замість окремого видалення для кожного ключа
+        self.sorted_keys[:end] = kept
     
     def delete(self, key: tuple) -> None:
         '''Видаляє пару ключ-значення з кешу'''
         if key in self.cache:
             del self.cache[key]
+            self._remove_sorted(key)
+
+    def _remove_sorted(self, key: tuple) -> None:
+        '''Видаляє ключ з відсортованого списку діапазонів'''
+        pos = bisect_left(self.sorted_keys, key)
+        del self.sorted_keys[pos]
+
+class FenwickTree:
+    '''Реалізація дерева Фенвіка (Binary Indexed Tree)'''
+    def __init__(self, array: list):
+        self.n = len(array)
+        self.tree = [0] * (self.n + 1)
+        self.tree[1:] = array
+        # Побудова за O(N): кожен вузол додає себе до батьківського
+        tree = self.tree
+        for i in range(1, self.n + 1):
+            parent = i + (i & -i)
+            if parent <= self.n:
+                tree[parent] += tree[i]
+
+    def add(self, i: int, delta: int) -> None:
+        '''Додає delta до елемента з індексом i (нумерація з 1)'''
+        tree = self.tree
+        n = self.n
+        while i <= n:
+            tree[i] += delta
+            i += i & -i
+
+    def prefix_sum(self, i: int) -> int:
+        '''Повертає суму перших i елементів'''
+        tree = self.tree
+        total = 0
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def range_sum(self, left: int, right: int) -> int:
+        '''Повертає суму діапазону [left, right] (нумерація з 0)'''
+        return self.prefix_sum(right + 1) - self.prefix_sum(left)
 
 def range_sum_no_cache(array: list, left: int, right: int) -> int:
     '''Обчислює суму диапазону без кешування'''
@@ -38,7 +98,8 @@ def range_sum_no_cache(array: list, left: int, right: int) -> int:
 
 def update_no_cache(array: list, index: int, value: int) -> None:
     '''Оновлює значення в масиві без кешування'''
-    array[index] = value
+    if array[index] != value:
+        array[index] = value
 
 def range_sum_with_cache(array: list, left: int, right: int, cache: LRUCache) -> int:
     '''Обчислює суму диапазону з LRU-кешуванням'''
@@ -58,36 +119,99 @@ def range_sum_with_cache(array: list, left: int, right: int, cache: LRUCache) ->
 
 def update_with_cache(array: list, index: int, value: int, cache: LRUCache) -> None:
     '''Оновлює значення в масиві з LRU-кешуванням'''
+    # Значення не змінилося: кешовані суми залишаються актуальними
+    if array[index] == value:
+        return
+
     # Оновлюємо сам масив
     array[index] = value
 
-    # Інвалідуємо кеш
-    keys_to_check = cache.get_keys()
+    # Інвалідуємо кеш: видаляємо лише діапазони, що містять оновлений індекс
+    cache.invalidate(index)
+
+def run_queries_no_cache(array: list, queries: tuple) -> list:
+    '''Обробляє потік запитів без кешування'''
+    # Таблиця обробників, індексована типом запиту (RANGE = 0, UPDATE = 1)
+    handlers = (range_sum_no_cache, update_no_cache)
+    results = [handlers[q_type](array, left, right)
+               for q_type, left, right in zip(*queries)]
+    # Оновлення повертають None, залишаємо лише суми діапазонів
+    return [value for value in results if value is not None]
+
+def run_queries_with_cache(array: list, queries: tuple, cache: LRUCache) -> list:
+    '''Обробляє потік запитів з LRU-кешуванням'''
+    handlers = (range_sum_with_cache, update_with_cache)
+    results = [handlers[q_type](array, left, right, cache)
+               for q_type, left, right in zip(*queries)]
+    return [value for value in results if value is not None]
+
+def build_prefix(array: list) -> list:
+    '''Будує масив префіксних сум: prefix[i] = sum(array[:i])'''
+    return list(accumulate(array, initial=0))
+
+def update_prefix(array: list, prefix: list, index: int, value: int) -> None:
+    '''Оновлює значення в масиві та перебудовує префіксні суми'''
+    if array[index] == value:
+        return
+    array[index] = value
+    # Змінюються лише префікси правіше index: перераховуємо тільки суфікс
+    prefix[index:] = accumulate(array[index:], initial=prefix[index])
+
+def run_queries_prefix(array: list, queries: tuple) -> list:
+    '''Пакетно обробляє потік запитів через префіксні суми'''
+    results = []
+    append = results.append
+    prefix = build_prefix(array)
+    update = update_prefix
+
+    for q_type, left, right in zip(*queries):
+        if q_type == RANGE:
+            append(prefix[right + 1] - prefix[left])
+        else:
+            # Оновлення перераховує лише суфікс префіксів правіше індексу
+            update(array, prefix, left, right)
+
+    return results
 
-    for key in keys_to_check:
-        left, right = key
-        # Якщо оновлений індекс знаходиться в діапазоні кешованого запиту, видаляємо його з кешу
-        if left <= index <= right:
-            cache.delete(key)
+def run_queries_fenwick(array: list, queries: tuple) -> list:
+    '''Обробляє потік запитів через дерево Фенвіка'''
+    results = []
+    append = results.append
+    tree = FenwickTree(array)
+    range_sum = tree.range_sum
+    add = tree.add
+
+    for q_type, left, right in zip(*queries):
+        if q_type == RANGE:
+            append(range_sum(left, right))
+        elif array[left] != right:
+            add(left + 1, right - array[left])
+            array[left] = right
+
+    return results
 
 def make_queries(n, q, hot_pool=30, p_hot=0.95, p_update=0.03):
-    '''Генерує список запитів'''
+    '''Генерує запити як три паралельні списки: типи, ліві та праві аргументи'''
     hot = [(random.randint(0, n//2), random.randint(n//2, n-1))
            for _ in range(hot_pool)]
-    queries = []
-    for _ in range(q):
-        if random.random() < p_update:        # ~3% запитів — Update
-            idx = random.randint(0, n-1)
-            val = random.randint(1, 100)
-            queries.append(("Update", idx, val))
+    types, lefts, rights = [], [], []
+    add_type, add_left, add_right = types.append, lefts.append, rights.append
+    # random() дешевший за randint(), тому цілі числа отримуємо масштабуванням
+    rand = random.random
+    # «Гарячі» діапазони обираються одним пакетним викликом для всіх запитів
+    for left, right in random.choices(hot, k=q):
+        if rand() < p_update:                 # ~3% запитів — Update
+            add_type(UPDATE)
+            add_left(int(rand() * n))
+            add_right(int(rand() * 100) + 1)
         else:                                 # ~97% — Range
-            if random.random() < p_hot:       # 95% — «гарячі» діапазони
-                left, right = random.choice(hot)
-            else:                             # 5% — випадкові діапазони
-                left = random.randint(0, n-1)
-                right = random.randint(left, n-1)
-            queries.append(("Range", left, right))
-    return queries
+            if rand() >= p_hot:               # 5% — випадкові замість «гарячих»
+                left = int(rand() * n)
+                right = left + int(rand() * (n - left))
+            add_type(RANGE)
+            add_left(left)
+            add_right(right)
+    return types, lefts, rights
 
 def main():
     '''Головна функція для виконання порівняння кешованих і некешованих запитів'''
@@ -114,12 +238,7 @@ def main():
     array_no_cache = master_array.copy()
     start_no_cache = time.perf_counter()
 
-    for query in queries:
-        q_type = query[0]
-        if q_type == "Range":
-            range_sum_no_cache(array_no_cache, query[1], query[2])
-        else:
-            update_no_cache(array_no_cache, query[1], query[2])
+    run_queries_no_cache(array_no_cache, queries)
 
     end_no_cache = time.perf_counter()
     time_no_cache = end_no_cache - start_no_cache
@@ -131,16 +250,33 @@ def main():
     lru_cache = LRUCache(capacity=K)
     start_cache = time.perf_counter()
 
-    for query in queries:
-        q_type = query[0]
-        if q_type == "Range":
-            range_sum_with_cache(array_with_cache, query[1], query[2], lru_cache)
-        else:
-            update_with_cache(array_with_cache, query[1], query[2], lru_cache)
-    
+    run_queries_with_cache(array_with_cache, queries, lru_cache)
+
     end_cache = time.perf_counter()
     time_with_cache = end_cache - start_cache
 
+    print("Запуск тесту з префіксними сумами...")
+
+    # Тест з префіксними сумами
+    array_prefix = master_array.copy()
+    start_prefix = time.perf_counter()
+
+    run_queries_prefix(array_prefix, queries)
+
+    end_prefix = time.perf_counter()
+    time_prefix = end_prefix - start_prefix
+
+    print("Запуск тесту з деревом Фенвіка...")
+
+    # Тест з деревом Фенвіка
+    array_fenwick = master_array.copy()
+    start_fenwick = time.perf_counter()
+
+    run_queries_fenwick(array_fenwick, queries)
+
+    end_fenwick = time.perf_counter()
+    time_fenwick = end_fenwick - start_fenwick
+
     # Виведення результатів
     print("\n" + "Результати тестування")
 
@@ -152,5 +288,17 @@ def main():
     else:
         print(f"LRU-кеш : {time_with_cache:>6.2f} c")
 
+    if time_prefix > 0:
+        acceleration = time_no_cache / time_prefix
+        print(f"Префікси: {time_prefix:>6.2f} c  (прискорення ×{acceleration:.1f})")
+    else:
+        print(f"Префікси: {time_prefix:>6.2f} c")
+
+    if time_fenwick > 0:
+        acceleration = time_no_cache / time_fenwick
+        print(f"Фенвік  : {time_fenwick:>6.2f} c  (прискорення ×{acceleration:.1f})")
+    else:
+        print(f"Фенвік  : {time_fenwick:>6.2f} c")
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,73 +1,121 @@
 import random
-from typing import Dict
+from typing import Callable, Dict, Optional, Union
 import time
 from collections import deque
 
 class SlidingWindowRateLimiter:
     '''Реалізація лімітатора швидкості з використанням ковзного вікна'''
-    def __init__(self, window_size: int = 10, max_requests: int = 1):
+    # Кількість записаних повідомлень між періодичними очищеннями словника
+    SWEEP_INTERVAL = 4096
+
+    def __init__(self, window_size: int = 10, max_requests: int = 1,
+                 clock: Callable[[], float] = time.monotonic):
         self.window_size = window_size
         self.max_requests = max_requests
+        # Джерело часу: за замовчуванням монотонний годинник, який не стрибає
+        # назад при корекції системного часу (NTP); у тестах — симульований
+        self._clock = clock
+        # При ліміті в 1 повідомлення достатньо однієї часової мітки
+        # на користувача замість окремої черги
+        self._single = max_requests == 1
         # Словник для зберігання історії запитів
-        self.user_requests: Dict[str, deque] = {}
-
-    def _cleanup_window(self, user_id: str, current_time: float) -> None:
-        '''Видаляє застарілі часові мітки з вікна користувача'''
-        if user_id in self.user_requests:
-            window = self.user_requests[user_id]
+        self.user_requests: Dict[str, Union[deque, float]] = {}
+        self._sweep_counter = 0
+
+    def _cleanup_window(self, user_id: str, current_time: float) -> Optional[deque]:
+        '''Видаляє застарілі часові мітки з вікна користувача і повертає вікно'''
+        # Один пошук у словнику: очищене вікно повертається викликачу
+        window = self.user_requests.get(user_id)
+        if window:
             # Розраховуємо початкову точку вікна
             window_start = current_time - self.window_size
 
             # Поки в черзі є елементи І найстаріший елемент (зліва)
             # знаходиться за межами вікна, видаляємо його
+            popleft = window.popleft
             while window and window[0] < window_start:
-                window.popleft()
-
-            # Якщо вікно спорожніло, видаляємо запис про користувача
-            if not window:
-                del self.user_requests[user_id]
+                popleft()
+
+            # Порожнє вікно не видаляємо одразу: воно знадобиться при
+            # наступному повідомленні, а звільняє пам'ять _sweep
+        return window
+
+    def _sweep(self, current_time: float) -> None:
+        '''Періодично видаляє записи користувачів без актуальних повідомлень'''
+        window_start = current_time - self.window_size
+        if self._single:
+            stale = [user_id for user_id, last_time in self.user_requests.items()
+                     if last_time < window_start]
+        else:
+            # Вікно застаріло повністю, якщо навіть найновіша мітка поза ним
+            stale = [user_id for user_id, window in self.user_requests.items()
+                     if not window or window[-1] < window_start]
+        for user_id in stale:
+            del self.user_requests[user_id]
 
     def can_send_message(self, user_id: str) -> bool:
         '''Перевіряє, чи може користувач відправити повідомлення ЗАРАЗ'''
-        current_time = time.time()
-        self._cleanup_window(user_id, current_time)
+        current_time = self._clock()
+
+        if self._single:
+            last_time = self.user_requests.get(user_id)
+            return last_time is None or last_time < current_time - self.window_size
 
-        # Якщо запису про користувача немає, це його перший запит
-        if user_id not in self.user_requests:
+        window = self._cleanup_window(user_id, current_time)
+
+        # Якщо запису немає або вікно порожнє, повідомлення дозволене
+        if not window:
             return True
         
         # Перевіряємо, чи не перевищено ліміт
-        return len(self.user_requests[user_id]) < self.max_requests
+        return len(window) < self.max_requests
 
     def record_message(self, user_id: str) -> bool:
         '''Намагається записати нове повідомлення'''
-        current_time = time.time()
-
-        # Спочатку очищуємо вікно від старих записів
-        self._cleanup_window(user_id, current_time)
+        current_time = self._clock()
+
+        self._sweep_counter += 1
+        if self._sweep_counter >= self.SWEEP_INTERVAL:
+            self._sweep_counter = 0
+            self._sweep(current_time)
+
+        if self._single:
+            last_time = self.user_requests.get(user_id)
+            if last_time is not None and last_time >= current_time - self.window_size:
+                return False
+            self.user_requests[user_id] = current_time
+            return True
 
-        # Отримуємо вікно користувача
-        window = self.user_requests.setdefault(user_id, deque())
+        # Очищуємо вікно від старих записів і отримуємо його
+        # без створення нової черги
+        window = self._cleanup_window(user_id, current_time)
 
-        # Перевірка ліміту
-        if len(window) < self.max_requests:
-            # Ліміт не досягнуто, додаємо поточну часову мітку
-            window.append(current_time)
-            return True
-        else:
+        # Перевірка ліміту: відхиляємо до будь-яких алокацій
+        if (len(window) if window is not None else 0) >= self.max_requests:
             # Ліміт досягнуто, повідомлення відхилено
             return False
 
+        # Ліміт не досягнуто, додаємо поточну часову мітку
+        if window is None:
+            window = self.user_requests[user_id] = deque()
+        window.append(current_time)
+        return True
+
     def time_until_next_allowed(self, user_id: str) -> float:
         '''Розраховує час в секундах до наступного дозволеного повідомлення'''
-        current_time = time.time()
-        self._cleanup_window(user_id, current_time)
+        current_time = self._clock()
+
+        if self._single:
+            last_time = self.user_requests.get(user_id)
+            if last_time is None:
+                return 0.0
+            return max(0.0, last_time + self.window_size - current_time)
+
+        window = self._cleanup_window(user_id, current_time)
 
-        if user_id not in self.user_requests:
+        if not window:
             # Користувач не надсилав повідомлень (або вони застаріли)
             return 0.0
-        
-        window = self.user_requests[user_id]
 
         if len(window) < self.max_requests:
             # Ліміт не досягнуто, повідомлення можна відправити зараз
@@ -85,10 +133,25 @@ class SlidingWindowRateLimiter:
         # Повертаємо 0.0, якщо час очікування негативний
         return max(0.0, wait_time)
 
+class SimulatedClock:
+    '''Логічний годинник, час якого просувається вручну'''
+    def __init__(self, start: float = 0.0):
+        self.now = start
+
+    def __call__(self) -> float:
+        '''Повертає поточний симульований час'''
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        '''Просуває час на задану кількість секунд'''
+        self.now += seconds
+
 # Демонстрація роботи
 def test_rate_limiter():
+    # Симульований годинник замість реального очікування через time.sleep
+    clock = SimulatedClock()
     # Створюємо rate limiter: вікно 10 секунд, 1 повідомлення
-    limiter = SlidingWindowRateLimiter(window_size=10, max_requests=1)
+    limiter = SlidingWindowRateLimiter(window_size=10, max_requests=1, clock=clock)
 
     # Симулюємо потік повідомлень від користувачів (послідовні ID від 1 до 20)
     print("\n=== Симуляція потоку повідомлень ===")
@@ -104,11 +167,11 @@ def test_rate_limiter():
 
         # Невелика затримка між повідомленнями для реалістичності
         # Випадкова затримка від 0.1 до 1 секунди
-        time.sleep(random.uniform(0.1, 1.0))
+        clock.advance(random.uniform(0.1, 1.0))
 
     # Чекаємо, поки вікно очиститься
     print("\nОчікуємо 4 секунди...")
-    time.sleep(4)
+    clock.advance(4)
 
     print("\n=== Нова серія повідомлень після очікування ===")
     for message_id in range(11, 21):
@@ -118,7 +181,7 @@ def test_rate_limiter():
         print(f"Повідомлення {message_id:2d} | Користувач {user_id} | "
               f"{'✓' if result else f'× (очікування {wait_time:.1f}с)'}")
         # Випадкова затримка від 0.1 до 1 секунди
-        time.sleep(random.uniform(0.1, 1.0))
+        clock.advance(random.uniform(0.1, 1.0))
 
 if __name__ == "__main__":
     test_rate_limiter()